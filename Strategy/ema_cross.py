@@ -6,7 +6,6 @@ import pandas as pd
 from nautilus_trader.model import Bar, BarType, Quantity
 from nautilus_trader.model.enums import OrderSide
 from nautilus_trader.trading.strategy import Strategy, StrategyConfig
-from nautilus_trader.indicators import ExponentialMovingAverage
 
 
 class EMACrossStrategy(Strategy):
@@ -20,7 +19,7 @@ class EMACrossStrategy(Strategy):
         self,
         stock_data: Dict[str, pd.DataFrame],
         index_data: Dict[str, pd.DataFrame],
-        bar_types: Dict[str, str],
+        bar_types: Dict[str, BarType],
         ticker: str = "AAPL",
         invest_amount: float = 50000.0,
         fast_ema_period: int = 10,
@@ -34,38 +33,56 @@ class EMACrossStrategy(Strategy):
         self.ticker = ticker
         self.invest_amount = invest_amount
 
-        # EMA indicators
-        self.fast_ema = ExponentialMovingAverage(fast_ema_period)
-        self.slow_ema = ExponentialMovingAverage(slow_ema_period)
+        # EMA state, updated inline in on_bar (same recurrence as
+        # nautilus_trader's ExponentialMovingAverage, without the dispatch)
+        self.fast_ema_period = fast_ema_period
+        self.slow_ema_period = slow_ema_period
+        self._fast_alpha = 2.0 / (fast_ema_period + 1.0)
+        self._slow_alpha = 2.0 / (slow_ema_period + 1.0)
+        self._fast = 0.0
+        self._slow = 0.0
+        self._count = 0
 
         # State
         self.target_shares = 0
         self.is_long = False
+        self._prev_sign = 0  # sign of (fast - slow) at the last acted-on cross
+        self._bar_type = None  # set in on_start
 
     def on_start(self):
-        """Subscribe to stock data and register indicators."""
+        """Subscribe to stock data."""
         if self.ticker not in self.all_bar_types:
             self.log.error(f"{self.ticker} not found in bar types")
             return
 
-        bar_type = BarType.from_str(self.all_bar_types[self.ticker])
-        self.register_indicator_for_bars(bar_type, self.fast_ema)
-        self.register_indicator_for_bars(bar_type, self.slow_ema)
+        bar_type = self.all_bar_types[self.ticker]
+        self._bar_type = bar_type
         self.subscribe_bars(bar_type)
-        self.log.info(f"Subscribed to {self.ticker} with EMA({self.fast_ema.period}, {self.slow_ema.period})")
+        self.log.info(f"Subscribed to {self.ticker} with EMA({self.fast_ema_period}, {self.slow_ema_period})")
 
     def on_bar(self, bar: Bar):
         """Check for EMA crossover signals."""
-        # Wait for indicators to initialize
-        if not self.fast_ema.initialized or not self.slow_ema.initialized:
+        price = float(bar.close)
+
+        # Update EMAs (seeded with the first close)
+        if self._count == 0:
+            self._fast = price
+            self._slow = price
+        self._fast = self._fast_alpha * price + (1.0 - self._fast_alpha) * self._fast
+        self._slow = self._slow_alpha * price + (1.0 - self._slow_alpha) * self._slow
+        self._count += 1
+
+        # Wait for both EMAs to see a full period
+        if self._count < self.fast_ema_period or self._count < self.slow_ema_period:
             return
 
-        fast = self.fast_ema.value
-        slow = self.slow_ema.value
-        price = float(bar.close)
+        # Edge-triggered: act only when the sign of (fast - slow) flips
+        sign = (self._fast > self._slow) - (self._fast < self._slow)
+        if sign == 0 or sign == self._prev_sign:
+            return
 
         # Golden Cross: Fast EMA crosses above Slow EMA -> Buy
-        if fast > slow and not self.is_long:
+        if sign > 0:
             self.target_shares = int(self.invest_amount / price)
             if self.target_shares > 0:
                 order = self.order_factory.market(
@@ -75,23 +92,25 @@ class EMACrossStrategy(Strategy):
                 )
                 self.submit_order(order)
                 self.is_long = True
+                self._prev_sign = sign
                 self.log.info(f"BUY {self.target_shares} {self.ticker} @ {price:.2f} (Golden Cross)")
 
         # Death Cross: Fast EMA crosses below Slow EMA -> Sell
-        elif fast < slow and self.is_long:
-            order = self.order_factory.market(
-                instrument_id=bar.bar_type.instrument_id,
-                order_side=OrderSide.SELL,
-                quantity=Quantity.from_int(self.target_shares),
-            )
-            self.submit_order(order)
-            self.is_long = False
-            self.log.info(f"SELL {self.target_shares} {self.ticker} @ {price:.2f} (Death Cross)")
+        else:
+            if self.is_long:
+                order = self.order_factory.market(
+                    instrument_id=bar.bar_type.instrument_id,
+                    order_side=OrderSide.SELL,
+                    quantity=Quantity.from_int(self.target_shares),
+                )
+                self.submit_order(order)
+                self.is_long = False
+                self.log.info(f"SELL {self.target_shares} {self.ticker} @ {price:.2f} (Death Cross)")
+            self._prev_sign = sign
 
     def on_stop(self):
-        if self.ticker in self.all_bar_types:
-            bar_type = BarType.from_str(self.all_bar_types[self.ticker])
-            self.unsubscribe_bars(bar_type)
+        if self._bar_type is not None:
+            self.unsubscribe_bars(self._bar_type)
 
     def on_dispose(self):
         pass
\ No newline at end of file
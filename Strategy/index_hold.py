@@ -15,7 +15,7 @@ class IndexHoldStrategy(Strategy):
         self,
         stock_data: Dict[str, pd.DataFrame],
         index_data: Dict[str, pd.DataFrame],
-        bar_types: Dict[str, str],
+        bar_types: Dict[str, BarType],
         ticker: str = "SPY",
         invest_amount: float = 50000.0,
         **kwargs,
@@ -30,6 +30,7 @@ class IndexHoldStrategy(Strategy):
 
         self.target_shares = 0
         self.bought = False
+        self._bar_type = None  # set in on_start
 
     def on_start(self):
         """Subscribe to index data."""
@@ -37,7 +38,8 @@ class IndexHoldStrategy(Strategy):
             self.log.error(f"{self.ticker} not found in bar types")
             return
 
-        bar_type = BarType.from_str(self.all_bar_types[self.ticker])
+        bar_type = self.all_bar_types[self.ticker]
+        self._bar_type = bar_type
         self.subscribe_bars(bar_type)
 
     def on_bar(self, bar: Bar):
@@ -58,9 +60,8 @@ class IndexHoldStrategy(Strategy):
             self.bought = True
 
     def on_stop(self):
-        if self.ticker in self.all_bar_types:
-            bar_type = BarType.from_str(self.all_bar_types[self.ticker])
-            self.unsubscribe_bars(bar_type)
+        if self._bar_type is not None:
+            self.unsubscribe_bars(self._bar_type)
 
     def on_dispose(self):
         pass
@@ -1,13 +1,13 @@
 """Momentum strategy - selects and trades stocks internally (buy and hold)."""
 
-from typing import Dict
+from typing import Dict, Optional
 import pandas as pd
 
 from nautilus_trader.model import Bar, BarType, InstrumentId, Quantity
 from nautilus_trader.model.enums import OrderSide
 from nautilus_trader.trading.strategy import Strategy, StrategyConfig
 
-from Strategy.stock_selector import momentum_select
+from Strategy.stock_selector import PricePanel, _last_close, close_matrix, momentum_select_fast
 
 
 class MomentumStrategy(Strategy):
@@ -21,10 +21,11 @@ class MomentumStrategy(Strategy):
         self,
         stock_data: Dict[str, pd.DataFrame],
         index_data: Dict[str, pd.DataFrame],
-        bar_types: Dict[str, str],
+        bar_types: Dict[str, BarType],
         invest_amount: float = 50000.0,
         top_n: int = 50,
         lookback_days: int = 200,
+        price_panel: Optional[PricePanel] = None,
         **kwargs,
     ):
         super().__init__(config=StrategyConfig())
@@ -32,6 +33,7 @@ class MomentumStrategy(Strategy):
         # Data from backtester
         self.stock_data = stock_data
         self.all_bar_types = bar_types
+        self._close = close_matrix(stock_data, price_panel)
 
         # Strategy parameters
         self.invest_amount = invest_amount
@@ -46,16 +48,17 @@ class MomentumStrategy(Strategy):
 
     def on_start(self):
         """Subscribe to all stocks."""
+        self._id_to_ticker = {bt.instrument_id: t for t, bt in self.all_bar_types.items()}
+
         for ticker in self.stock_data:
             if ticker in self.all_bar_types:
-                bar_type = BarType.from_str(self.all_bar_types[ticker])
-                self.subscribe_bars(bar_type)
+                self.subscribe_bars(self.all_bar_types[ticker])
 
     def _initialize(self, as_of_date: str):
         """Select stocks and calculate shares on first bar."""
         # 1. Select stocks using momentum
-        self.selected_stocks = momentum_select(
-            self.stock_data,
+        self.selected_stocks = momentum_select_fast(
+            self._close,
             as_of_date=as_of_date,
             lookback_days=self.lookback_days,
             top_n=self.top_n,
@@ -72,16 +75,13 @@ class MomentumStrategy(Strategy):
             if ticker not in self.stock_data:
                 continue
 
-            df = self.stock_data[ticker]
-            close_col = 'Close' if 'Close' in df.columns else 'close'
+            price = _last_close(self.stock_data[ticker], as_of_date)
+            if price is None:
+                continue
 
-            try:
-                price = float(df.loc[:as_of_date][close_col].iloc[-1])
-                shares = int(per_stock / price)
-                if shares > 0:
-                    self.target_shares[ticker] = shares
-            except Exception:
-                pass
+            shares = int(per_stock / price)
+            if shares > 0:
+                self.target_shares[ticker] = shares
 
         self.log.info(f"Will trade {len(self.target_shares)} stocks")
         self.initialized = True
@@ -93,11 +93,11 @@ class MomentumStrategy(Strategy):
             current_date = pd.Timestamp(bar.ts_event, unit='ns')
             self._initialize(current_date.strftime('%Y-%m-%d'))
 
-        ticker = str(bar.bar_type.instrument_id).split('.')[0]
+        ticker = self._id_to_ticker[bar.bar_type.instrument_id]
 
         # Only trade selected stocks that we haven't bought yet
         if ticker in self.target_shares and ticker not in self.bought:
-            self._buy(instrument_id, self.target_shares[ticker])
+            self._buy(bar.bar_type.instrument_id, self.target_shares[ticker])
             self.bought.add(ticker)
 
     def _buy(self, instrument_id: InstrumentId, shares: int):
@@ -115,8 +115,7 @@ class MomentumStrategy(Strategy):
         """Cleanup on strategy stop."""
         for ticker in self.selected_stocks:
             if ticker in self.all_bar_types:
-                bar_type = BarType.from_str(self.all_bar_types[ticker])
-                self.unsubscribe_bars(bar_type)
+                self.unsubscribe_bars(self.all_bar_types[ticker])
 
     def on_dispose(self):
         pass
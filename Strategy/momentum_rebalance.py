@@ -1,13 +1,16 @@
 """Momentum strategy with periodic rebalancing."""
 
-from typing import Dict, Set
+from typing import Dict, Optional, Set
+import numpy as np
 import pandas as pd
 
 from nautilus_trader.model import Bar, BarType, Quantity
 from nautilus_trader.model.enums import OrderSide
 from nautilus_trader.trading.strategy import Strategy, StrategyConfig
 
-from Strategy.stock_selector import momentum_select
+from Strategy.stock_selector import PricePanel, close_matrix, top_momentum_columns
+
+_NS_PER_DAY = 86_400_000_000_000
 
 
 class MomentumRebalanceStrategy(Strategy):
@@ -23,17 +26,19 @@ class MomentumRebalanceStrategy(Strategy):
         self,
         stock_data: Dict[str, pd.DataFrame],
         index_data: Dict[str, pd.DataFrame],
-        bar_types: Dict[str, str],
+        bar_types: Dict[str, BarType],
         invest_amount: float = 50000.0,
         top_n: int = 50,
         lookback_days: int = 200,
         rebalance_frequency: str = "monthly",
+        price_panel: Optional[PricePanel] = None,
         **kwargs,
     ):
         super().__init__(config=StrategyConfig())
 
         self.stock_data = stock_data
         self.all_bar_types = bar_types
+        self._close = close_matrix(stock_data, price_panel)
 
         self.invest_amount = invest_amount
         self.top_n = top_n
@@ -42,44 +47,71 @@ class MomentumRebalanceStrategy(Strategy):
 
         # Current state
         self.selected_stocks: Set[str] = set()
-        self.positions: Dict[str, int] = {}  # ticker -> shares
         self.cash = invest_amount  # Track cash (start with invest_amount)
-        self.last_rebalance_month = None
-
-        # Track daily equity for accurate reporting
-        self.equity_history: Dict[str, float] = {}  # date_str -> equity
-        self.last_prices: Dict[str, float] = {}  # ticker -> last price
+        self.last_rebalance_month = None  # year * 12 + month - 1
+
+        # Positions and last prices as arrays indexed by ticker column
+        self._tickers = list(self._close.columns)
+        self._tix = {t: i for i, t in enumerate(self._tickers)}
+        self._pos = np.zeros(len(self._tickers), dtype=np.int64)  # shares
+        self._last_px = np.zeros(len(self._tickers), dtype=np.float64)
+
+        # Track daily equity for accurate reporting: one slot per trading day,
+        # NaN until the day is traded. Dates are int64 nanoseconds (whatever
+        # unit the data loaded with) to compare with ts_event and Timestamp.value
+        self._dates = self._close.index.as_unit('ns').asi8
+        self._eq_val = np.full(len(self._dates), np.nan)
+        self._equity_day = None  # day number (ts // _NS_PER_DAY) being traded
+        self._equity_row = -1  # slot in _eq_val for that day
 
     def on_start(self):
         """Subscribe to ALL stocks (we need to trade any of them)."""
-        for ticker, bar_type_str in self.all_bar_types.items():
+        # Orders reuse these instrument IDs
+        self._instr = {t: bt.instrument_id for t, bt in self.all_bar_types.items()}
+        self._id_to_ticker = {iid: t for t, iid in self._instr.items()}
+
+        for ticker, bar_type in self.all_bar_types.items():
             if ticker in self.stock_data:  # Only stocks, not indices
-                bar_type = BarType.from_str(bar_type_str)
                 self.subscribe_bars(bar_type)
 
         self.log.info(f"Subscribed to {len(self.stock_data)} stocks")
 
+        # float32 shadow of the raw closes (date x ticker), used only to rank
+        # momentum; cash accounting keeps the float64 prices below
+        self._close_f32 = self._close.to_numpy(np.float32)
+
+        # First row with a close per ticker (len(dates) if none): a ticker is
+        # eligible once lookback_days rows of its history are available
+        valid = self._close.notna().to_numpy()
+        self._first_row = np.where(valid.any(axis=0), valid.argmax(axis=0), len(valid))
+
+        # Last known close on or before each date (date x ticker), for
+        # O(log n) price lookups
+        self._close_np = self._close.ffill().to_numpy()
+
     def on_bar(self, bar: Bar):
         """Check if rebalance needed, then execute trades."""
-        current_date = pd.Timestamp(bar.ts_event, unit='ns')
-        ticker = str(bar.bar_type.instrument_id).split('.')[0]
-        price = float(bar.close)
+        # Dates, months and the rebalance check only change with the day, so
+        # the other bars of a day skip them after one integer compare
+        day = bar.ts_event // _NS_PER_DAY
+        if day != self._equity_day:
+            self._on_new_day(day, bar.ts_event)
 
         # Update last known price
-        self.last_prices[ticker] = price
+        self._last_px[self._tix[self._id_to_ticker[bar.bar_type.instrument_id]]] = float(bar.close)
 
-        # Check if it's time to rebalance
-        if self._should_rebalance(current_date):
-            self._do_rebalance(current_date)
+    def _on_new_day(self, day: int, ts: int):
+        """Record the previous day's closing equity, then maybe rebalance."""
+        self._record_equity()
+        self._equity_day = day
+        self._equity_row = int(np.searchsorted(self._dates, ts))
 
-        # Record daily equity (once per day, use last bar of day)
-        date_str = current_date.strftime('%Y-%m-%d')
-        self.equity_history[date_str] = self._calculate_equity()
-
-    def _should_rebalance(self, current_date: pd.Timestamp) -> bool:
-        """Check if we should rebalance on this date."""
-        current_month = current_date.to_period('M')
+        current_date = pd.Timestamp(ts, unit='ns')
+        if self._should_rebalance(current_date.year * 12 + current_date.month - 1):
+            self._do_rebalance(current_date)
 
+    def _should_rebalance(self, current_month: int) -> bool:
+        """Check if we should rebalance in this month (year * 12 + month - 1)."""
         # First bar or new month
         if self.last_rebalance_month is None:
             return True
@@ -87,7 +119,7 @@ class MomentumRebalanceStrategy(Strategy):
         if self.rebalance_frequency == "monthly":
             return current_month != self.last_rebalance_month
         elif self.rebalance_frequency == "quarterly":
-            return (current_month.month - 1) // 3 != (self.last_rebalance_month.month - 1) // 3
+            return (current_month % 12) // 3 != (self.last_rebalance_month % 12) // 3
 
         return False
 
@@ -97,12 +129,7 @@ class MomentumRebalanceStrategy(Strategy):
         self.log.info(f"=== REBALANCING on {date_str} ===")
 
         # 1. Select new stocks based on current momentum
-        new_selected = set(momentum_select(
-            self.stock_data,
-            as_of_date=date_str,
-            lookback_days=self.lookback_days,
-            top_n=self.top_n,
-        ))
+        new_selected = self._select_top(date_str)
 
         # 2. Determine what to sell and buy
         to_sell = self.selected_stocks - new_selected
@@ -112,9 +139,8 @@ class MomentumRebalanceStrategy(Strategy):
         self.log.info(f"Selling: {len(to_sell)}, Buying: {len(to_buy)}")
 
         # 3. Sell ALL current positions (to rebalance evenly)
-        for ticker in list(self.positions.keys()):
-            if self.positions.get(ticker, 0) > 0:
-                self._sell(ticker, self.positions[ticker], date_str)
+        for i in np.flatnonzero(self._pos > 0):
+            self._sell(self._tickers[i], int(self._pos[i]), date_str)
 
         # 4. Calculate investment amount based on current equity
         # Use invest_amount for first rebalance, current equity thereafter
@@ -134,7 +160,16 @@ class MomentumRebalanceStrategy(Strategy):
 
         # Update state
         self.selected_stocks = new_selected
-        self.last_rebalance_month = current_date.to_period('M')
+        self.last_rebalance_month = current_date.year * 12 + current_date.month - 1
+
+    def _select_top(self, as_of_date: str) -> Set[str]:
+        """Top N tickers by momentum, from the two close rows it needs."""
+        end = self._row_as_of(as_of_date) + 1
+
+        # Only tickers with enough history; one compare against start rows
+        cols = np.flatnonzero(self._first_row <= end - self.lookback_days)
+        top = top_momentum_columns(self._close_f32, end, cols, self.lookback_days, self.top_n)
+        return {self._tickers[i] for i in top}
 
     def _calculate_shares_with_budget(self, tickers: Set[str], as_of_date: str, budget: float) -> Dict[str, int]:
         """Calculate target shares for each stock given a budget."""
@@ -142,48 +177,37 @@ class MomentumRebalanceStrategy(Strategy):
             return {}
 
         per_stock = budget / len(tickers)
-        shares = {}
-
-        for ticker in tickers:
-            if ticker not in self.stock_data:
-                continue
-
-            price = self._get_price(ticker, as_of_date)
-            if price <= 0:
-                continue
+        i = self._row_as_of(as_of_date)
+        if i < 0:
+            return {}
 
-            qty = int(per_stock / price)
-            if qty > 0:
-                shares[ticker] = qty
+        # Gather all prices in one indexed read; missing prices buy nothing
+        names = [t for t in tickers if t in self._tix]
+        cols = np.fromiter((self._tix[t] for t in names), dtype=np.intp, count=len(names))
+        prices = self._close_np[i, cols]
+        qty = (per_stock / np.where(prices > 0, prices, np.inf)).astype(np.int64)
 
-        return shares
+        return {t: int(q) for t, q in zip(names, qty) if q > 0}
 
     def _get_price(self, ticker: str, as_of_date: str) -> float:
-        """Get price from DataFrame as of given date."""
-        if ticker not in self.stock_data:
+        """Last known close on or before the given date (0.0 if none)."""
+        j = self._tix.get(ticker)
+        i = self._row_as_of(as_of_date)
+        if j is None or i < 0 or np.isnan(self._close_np[i, j]):
             return 0.0
+        return float(self._close_np[i, j])
 
-        df = self.stock_data[ticker]
-        close_col = 'Close' if 'Close' in df.columns else 'close'
-
-        try:
-            # Get price on or before as_of_date
-            available = df.loc[:as_of_date]
-            if available.empty:
-                return 0.0
-            return float(available[close_col].iloc[-1])
-        except Exception:
-            return 0.0
+    def _row_as_of(self, as_of_date: str) -> int:
+        """Row of the last date on or before as_of_date (-1 if none)."""
+        return int(np.searchsorted(self._dates, pd.Timestamp(as_of_date).value, side='right')) - 1
 
     def _buy(self, ticker: str, shares: int, as_of_date: str):
         """Submit buy order."""
-        if ticker not in self.all_bar_types:
+        instrument_id = self._instr.get(ticker)
+        if instrument_id is None:
             return
 
-        bar_type_str = self.all_bar_types[ticker]
-        instrument_id = BarType.from_str(bar_type_str).instrument_id
-
-        # Get price from DataFrame for accurate cash tracking
+        # Forward-filled close as of the date, for accurate cash tracking
         price = self._get_price(ticker, as_of_date)
         if price <= 0:
             return
@@ -196,19 +220,17 @@ class MomentumRebalanceStrategy(Strategy):
             quantity=Quantity.from_int(shares),
         )
         self.submit_order(order)
-        self.positions[ticker] = self.positions.get(ticker, 0) + shares
+        self._pos[self._tix[ticker]] += shares
         self.cash -= cost  # Reduce cash
         self.log.info(f"BUY {shares} {ticker} @ {price:.2f}")
 
     def _sell(self, ticker: str, shares: int, as_of_date: str):
         """Submit sell order."""
-        if ticker not in self.all_bar_types:
+        instrument_id = self._instr.get(ticker)
+        if instrument_id is None:
             return
 
-        bar_type_str = self.all_bar_types[ticker]
-        instrument_id = BarType.from_str(bar_type_str).instrument_id
-
-        # Get price from DataFrame for accurate cash tracking
+        # Forward-filled close as of the date, for accurate cash tracking
         price = self._get_price(ticker, as_of_date)
         if price <= 0:
             return
@@ -221,30 +243,28 @@ class MomentumRebalanceStrategy(Strategy):
             quantity=Quantity.from_int(shares),
         )
         self.submit_order(order)
-        self.positions[ticker] = 0
+        self._pos[self._tix[ticker]] = 0
         self.cash += proceeds  # Add cash
         self.log.info(f"SELL {shares} {ticker} @ {price:.2f}")
 
     def _calculate_equity(self) -> float:
         """Calculate current total equity = cash + position values."""
-        position_value = 0.0
-        for ticker, shares in self.positions.items():
-            if shares > 0 and ticker in self.last_prices:
-                position_value += shares * self.last_prices[ticker]
-        return self.cash + position_value
+        return self.cash + float(self._pos @ self._last_px)
+
+    def _record_equity(self):
+        """Store equity for the day currently being traded."""
+        if 0 <= self._equity_row < len(self._eq_val):
+            self._eq_val[self._equity_row] = self._calculate_equity()
 
     def get_equity_series(self) -> pd.Series:
         """Get equity curve as pandas Series."""
-        if not self.equity_history:
-            return pd.Series(dtype=float)
-        dates = pd.to_datetime(list(self.equity_history.keys()))
-        values = list(self.equity_history.values())
-        return pd.Series(values, index=dates, name='equity').sort_index()
+        index = pd.DatetimeIndex(self._dates.view('datetime64[ns]'))
+        return pd.Series(self._eq_val, index=index, name='equity').dropna()
 
     def on_stop(self):
-        for ticker, bar_type_str in self.all_bar_types.items():
+        self._record_equity()
+        for ticker, bar_type in self.all_bar_types.items():
             if ticker in self.stock_data:
-                bar_type = BarType.from_str(bar_type_str)
                 self.unsubscribe_bars(bar_type)
 
     def on_dispose(self):
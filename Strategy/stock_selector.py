@@ -1,7 +1,8 @@
 """Stock selection module for index enhancement strategies."""
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Optional
 
 
 def momentum_select(stock_data: Dict[str, pd.DataFrame],
@@ -11,7 +12,7 @@ def momentum_select(stock_data: Dict[str, pd.DataFrame],
     """Select top N stocks by momentum (past returns).
 
     Args:
-        stock_data: dict of {ticker: DataFrame}
+        stock_data: dict of {ticker: DataFrame} with lowercase columns
         as_of_date: selection date (use data before this date)
         lookback_days: lookback period in trading days (default 200)
         top_n: number of stocks to select
@@ -19,31 +20,166 @@ def momentum_select(stock_data: Dict[str, pd.DataFrame],
     Returns:
         List of selected ticker symbols
     """
-    momentum = {}
-
+    # Price at as_of_date and lookback_days rows earlier, per ticker
+    names, current, past = [], [], []
     for ticker, df in stock_data.items():
-        try:
-            # Get data up to as_of_date
-            df = df.loc[:as_of_date]
-            if len(df) < lookback_days:
-                continue
+        # Rows up to as_of_date, counted without slicing the frame
+        end = df.index.searchsorted(pd.Timestamp(as_of_date), side='right')
+        if end < lookback_days:
+            continue
+        close = df['close']
+        names.append(ticker)
+        current.append(close.iloc[end - 1])
+        past.append(close.iloc[end - lookback_days])
+
+    ret = _momentum_returns(np.array(current, dtype=float), np.array(past, dtype=float))
+    return [names[i] for i in _top_n(ret, top_n)]
+
+
+def _momentum_returns(current: np.ndarray, past: np.ndarray) -> np.ndarray:
+    """Return current / past - 1, NaN where a price is missing or past is zero.
+
+    The one momentum formula behind momentum_select, momentum_scores and
+    top_momentum_columns.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = current / past - 1.0
+    ret[~np.isfinite(ret)] = np.nan
+    return ret
+
+
+def _top_n(ret: np.ndarray, top_n: int) -> np.ndarray:
+    """Positions of the top_n largest non-NaN returns, highest first."""
+    ret = np.nan_to_num(ret, nan=-np.inf)
+
+    # Partial sort: select top N in O(n), then order just those N
+    k = min(top_n, int(np.isfinite(ret).sum()))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-ret, k - 1)[:k]
+    return idx[np.argsort(-ret[idx], kind='stable')]
+
+
+class PricePanel(NamedTuple):
+    """OHLCV of many tickers as aligned (date x ticker) float64 arrays.
+
+    NaN where a ticker has no data on a date. Read prices as
+    panel.close[date_idx, ticker_idx] instead of .loc on per-ticker frames.
+    """
+    tickers: List[str]
+    dates: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
 
-            close_col = 'Close' if 'Close' in df.columns else 'close'
+def build_price_panel(stock_data: Dict[str, pd.DataFrame]) -> Optional[PricePanel]:
+    """Align every ticker's OHLCV into one PricePanel.
 
-            # Calculate momentum (return over lookback period)
-            current_price = float(df[close_col].iloc[-1])
-            past_price = float(df[close_col].iloc[-lookback_days])
-            returns = (current_price - past_price) / past_price
+    Args:
+        stock_data: dict of {ticker: DataFrame} with lowercase columns
+
+    Returns:
+        PricePanel with tickers sorted and dates ascending, or None when
+        stock_data is empty
+    """
+    if not stock_data:
+        return None
+    fields = ['open', 'high', 'low', 'close', 'volume']
+    tickers = sorted(stock_data)
+    wide = pd.concat([stock_data[t][fields] for t in tickers], axis=1, keys=tickers).sort_index()
+    arrays = {f: wide.xs(f, axis=1, level=1).to_numpy(dtype='float64') for f in fields}
+    return PricePanel(tickers, wide.index, **arrays)
 
-            momentum[ticker] = returns
-        except Exception:
-            pass
 
-    # Sort by momentum descending and select top N
-    sorted_stocks = sorted(momentum.items(), key=lambda x: x[1], reverse=True)
-    selected = [ticker for ticker, _ in sorted_stocks[:top_n]]
+def close_matrix(stock_data: Dict[str, pd.DataFrame],
+                 price_panel: Optional[PricePanel] = None) -> pd.DataFrame:
+    """build_close_matrix, reusing a prebuilt PricePanel when given."""
+    if price_panel is None:
+        return build_close_matrix(stock_data)
+    return pd.DataFrame(price_panel.close, index=price_panel.dates, columns=price_panel.tickers)
 
-    return selected
+
+def build_close_matrix(stock_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Align every ticker's close prices into one wide DataFrame.
+
+    Args:
+        stock_data: dict of {ticker: DataFrame} with lowercase columns
+
+    Returns:
+        float64 DataFrame indexed by date with one column per ticker
+        (sorted), NaN where a ticker has no data
+    """
+    close = pd.concat(
+        {t: df['close'] for t, df in stock_data.items()},
+        axis=1,
+    )
+    return close.sort_index().sort_index(axis=1).astype('float64')
+
+
+def momentum_scores(close_wide: pd.DataFrame,
+                    as_of_date: str,
+                    lookback_days: int = 200) -> pd.Series:
+    """Momentum of every ticker in a wide close-price matrix.
+
+    Reads only the two rows the return needs instead of slicing history.
+
+    Args:
+        close_wide: DataFrame from build_close_matrix
+        as_of_date: selection date (use data before this date)
+        lookback_days: lookback period in trading days (default 200)
+
+    Returns:
+        Series of {ticker: return}, NaN where there is not enough history
+    """
+    end = close_wide.index.searchsorted(pd.Timestamp(as_of_date), side='right')
+    if end < lookback_days:
+        return pd.Series(np.nan, index=close_wide.columns)
+
+    ret = _momentum_returns(close_wide.iloc[end - 1].to_numpy(),
+                            close_wide.iloc[end - lookback_days].to_numpy())
+    return pd.Series(ret, index=close_wide.columns)
+
+
+def momentum_select_fast(close_wide: pd.DataFrame,
+                         as_of_date: str,
+                         lookback_days: int = 200,
+                         top_n: int = 50) -> List[str]:
+    """Vectorized momentum_select over a wide close-price matrix.
+
+    Args:
+        close_wide: DataFrame from build_close_matrix
+        as_of_date: selection date (use data before this date)
+        lookback_days: lookback period in trading days (default 200)
+        top_n: number of stocks to select
+
+    Returns:
+        List of selected ticker symbols, highest momentum first
+    """
+    ret = momentum_scores(close_wide, as_of_date, lookback_days).to_numpy()
+    return close_wide.columns[_top_n(ret, top_n)].tolist()
+
+
+def top_momentum_columns(close: np.ndarray, end: int, cols: np.ndarray,
+                         lookback_days: int = 200, top_n: int = 50) -> np.ndarray:
+    """momentum_select on a (date x ticker) close array, for row-indexed callers.
+
+    Args:
+        close: close prices, one row per date and one column per ticker
+        end: number of rows up to and including the selection date
+        cols: candidate column indices
+        lookback_days: lookback period in trading days (default 200)
+        top_n: number of stocks to select
+
+    Returns:
+        Column indices (from cols) of the top N, highest momentum first
+    """
+    if end < lookback_days or len(cols) == 0:
+        return np.empty(0, dtype=np.intp)
+    ret = _momentum_returns(close[end - 1, cols], close[end - lookback_days, cols])
+    return cols[_top_n(ret, top_n)]
 
 
 def equal_weight(selected_stocks: List[str],
@@ -71,7 +207,7 @@ def calculate_shares(allocations: Dict[str, float],
 
     Args:
         allocations: dict of {ticker: dollar_amount}
-        stock_data: dict of {ticker: DataFrame}
+        stock_data: dict of {ticker: DataFrame} with lowercase columns
         as_of_date: date to get prices from
 
     Returns:
@@ -83,13 +219,17 @@ def calculate_shares(allocations: Dict[str, float],
         if ticker not in stock_data:
             continue
 
-        df = stock_data[ticker]
-        close_col = 'Close' if 'Close' in df.columns else 'close'
-
-        try:
-            price = float(df.loc[:as_of_date][close_col].iloc[-1])
+        price = _last_close(stock_data[ticker], as_of_date)
+        if price is not None:
             shares[ticker] = amount / price
-        except Exception:
-            pass
 
     return shares
+
+
+def _last_close(df: pd.DataFrame, as_of_date: str) -> Optional[float]:
+    """Last close on or before as_of_date; None if there is none or it is not positive."""
+    end = df.index.searchsorted(pd.Timestamp(as_of_date), side='right')
+    if end == 0:
+        return None
+    price = float(df['close'].iloc[end - 1])
+    return price if price > 0 else None
@@ -1,28 +1,53 @@
 """Universal backtester - handles all data preparation."""
 
+import hashlib
 import importlib
+import inspect
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from typing import Type, Dict, List
 
+import numpy as np
 import pandas as pd
+import pyarrow.feather as feather
 import yaml
 import quantstats as qs
 
+import nautilus_trader
 from nautilus_trader.backtest.engine import BacktestEngine
 from nautilus_trader.backtest.config import BacktestEngineConfig
-from nautilus_trader.model import BarType, Money, TraderId, Venue
+from nautilus_trader.model import Bar, BarSpecification, BarType, Money, TraderId, Venue
 from nautilus_trader.model.currencies import USD
-from nautilus_trader.model.enums import AccountType, OmsType
+from nautilus_trader.model.enums import (
+    AccountType, AggregationSource, BarAggregation, OmsType, PriceType,
+)
 from nautilus_trader.model.identifiers import InstrumentId, Symbol
 from nautilus_trader.model.instruments import Equity
 from nautilus_trader.model.objects import Price, Quantity
 from nautilus_trader.persistence.wranglers import BarDataWrangler
+from nautilus_trader.serialization.arrow.serializer import ArrowSerializer
 from nautilus_trader.trading.strategy import Strategy
 
 from data_loader import load_stock_data, load_index_data
+from Strategy.stock_selector import build_price_panel
 
 VENUE = Venue("NYSE")
 RESULT_DIR = os.path.join(os.path.dirname(__file__), "result")
+BAR_CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache", "bars")
+# Part of every bar cache file name; bump when make_bars output changes
+BAR_CACHE_VERSION = 2
+# Bars are stored as ArrowSerializer output, so the writing nautilus_trader
+# version is part of the name too
+_BAR_CACHE_SUFFIX = f"_v{BAR_CACHE_VERSION}_nt{nautilus_trader.__version__}.feather"
+
+_REPORT_POOL = None  # background QuantStats renderer, started on first use
+
+# Shared by every instrument / bar type instead of being re-parsed per ticker
+_PRICE_INCREMENT = Price.from_str("0.01")
+_LOT_SIZE = Quantity.from_int(1)
+_DAILY_BAR_SPEC = BarSpecification(1, BarAggregation.DAY, PriceType.LAST)
 
 
 # =============================================================================
@@ -31,67 +56,159 @@ RESULT_DIR = os.path.join(os.path.dirname(__file__), "result")
 
 def make_instrument(ticker: str, venue: Venue = VENUE) -> Equity:
     """Create a Nautilus Equity instrument."""
-    instrument_id = InstrumentId(Symbol(ticker), venue)
+    symbol = Symbol(ticker)
     return Equity(
-        instrument_id=instrument_id,
-        raw_symbol=Symbol(ticker),
+        instrument_id=InstrumentId(symbol, venue),
+        raw_symbol=symbol,
         currency=USD,
         price_precision=2,
-        price_increment=Price.from_str("0.01"),
-        lot_size=Quantity.from_int(1),
+        price_increment=_PRICE_INCREMENT,
+        lot_size=_LOT_SIZE,
         ts_event=0,
         ts_init=0,
     )
 
 
+def valid_ohlcv_rows(arr: np.ndarray) -> np.ndarray:
+    """Boolean mask of usable rows in an (n, 5) open/high/low/close/volume array.
+
+    Valid: all values finite, low <= open <= high, low <= close <= high.
+    Row-independent, so it works equally on one ticker or on many stacked.
+    """
+    op, hi, lo, cl, _ = arr.T
+    return (np.isfinite(arr).all(axis=1)
+            & (lo <= op) & (lo <= cl) & (hi >= op) & (hi >= cl) & (lo <= hi))
+
+
+def _date_slice(df: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
+    """Rows of df (sorted DatetimeIndex) from start through end, inclusive.
+
+    Same rows as df.loc[start:end] for daily timestamps, found by two binary
+    searches on the index instead of label-based slicing.
+    """
+    lo = df.index.searchsorted(pd.Timestamp(start), side='left')
+    hi = df.index.searchsorted(pd.Timestamp(end), side='right')
+    return df.iloc[lo:hi]
+
+
 def make_bars(ticker: str, instrument: Equity, df: pd.DataFrame,
               start_date: str, end_date: str) -> list:
     """Convert DataFrame to Nautilus Bar objects."""
-    df = df.copy()
-    df.index.name = "timestamp"
-    df = df.loc[start_date:end_date]
-    df.columns = [c.lower() for c in df.columns]
-    df = df[["open", "high", "low", "close", "volume"]]
-    df = df.dropna()
-
-    if df.empty:
-        return []
+    # Slicing builds a new frame, so the caller's data is never copied whole
+    # or modified (including the index label set below)
+    df = _date_slice(df, start_date, end_date)[["open", "high", "low", "close", "volume"]]
 
-    # Data quality: filter invalid OHLC rows
-    # Valid: low <= open <= high, low <= close <= high
-    valid = (
-        (df['low'] <= df['open']) &
-        (df['low'] <= df['close']) &
-        (df['high'] >= df['open']) &
-        (df['high'] >= df['close']) &
-        (df['low'] <= df['high'])
-    )
-    df = df[valid]
+    # Data quality: drop missing values and invalid OHLC rows in one mask
+    df = df[valid_ohlcv_rows(df.to_numpy(dtype=np.float64))]
+    df.index.name = "timestamp"
 
     if df.empty:
         return []
 
-    bar_type = BarType.from_str(f"{instrument.id}-1-DAY-LAST-EXTERNAL")
+    bar_type = BarType(instrument.id, _DAILY_BAR_SPEC, AggregationSource.EXTERNAL)
     wrangler = BarDataWrangler(bar_type=bar_type, instrument=instrument)
     bars = wrangler.process(df, ts_init_delta=86_400_000_000_000)
     return bars
 
 
+def load_bars(ticker: str, instrument: Equity, df: pd.DataFrame,
+              start_date: str, end_date: str, cache_dir: str = BAR_CACHE_DIR,
+              path: str = None) -> list:
+    """make_bars with an on-disk Arrow cache.
+
+    Entries are keyed by ticker, date range, a hash of the price data,
+    BAR_CACHE_VERSION and the nautilus_trader version, so changed data, bar
+    logic or serializer never hits a stale entry.
+    Decoding a cached file is several times faster than running
+    BarDataWrangler again. A window with no valid bars is cached as an empty
+    file. `path` skips re-hashing df when the caller already has the entry.
+    """
+    if path is None:
+        path = _bar_cache_path(ticker, df, start_date, end_date, cache_dir)
+    if os.path.exists(path):
+        if os.path.getsize(path) == 0:
+            return []
+        return Bar.from_pyo3_list(ArrowSerializer.deserialize(Bar, feather.read_table(path)))
+
+    bars = make_bars(ticker, instrument, df, start_date, end_date)
+    _write_bar_cache(ArrowSerializer.serialize_batch(bars, Bar) if bars else None, path)
+    return bars
+
+
+def _write_bar_cache(table, path: str):
+    """Write a cache file via a temp file, so an interrupted run leaves no partial entry.
+
+    table None writes an empty file (no bars in the window).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if table is not None:
+                feather.write_feather(table, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _bar_cache_path(ticker: str, df: pd.DataFrame, start_date: str, end_date: str,
+                    cache_dir: str = BAR_CACHE_DIR) -> str:
+    """Cache file for one ticker's bars over a date range."""
+    digest = hashlib.md5(pd.util.hash_pandas_object(df).to_numpy()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{ticker}_{start_date}_{end_date}_{digest}{_BAR_CACHE_SUFFIX}")
+
+
+def _prune_bar_cache(cache_dir: str = BAR_CACHE_DIR):
+    """Delete cache files from other BAR_CACHE_VERSION / nautilus_trader versions."""
+    if not os.path.isdir(cache_dir):
+        return
+    with os.scandir(cache_dir) as it:
+        stale = [e.path for e in it
+                 if e.name.endswith(".feather") and not e.name.endswith(_BAR_CACHE_SUFFIX)]
+    for path in stale:
+        os.remove(path)
+
+
+def _fill_bar_cache(ticker: str, df: pd.DataFrame, start_date: str, end_date: str, path: str):
+    """Worker: wrangle one ticker's bars into the cache (bars stay on disk)."""
+    load_bars(ticker, make_instrument(ticker), df, start_date, end_date, path=path)
+
+
 def prepare_all_data(
     stock_data: Dict[str, pd.DataFrame],
     index_data: Dict[str, pd.DataFrame],
     start_date: str,
-    end_date: str
+    end_date: str,
+    workers: int = None,
 ) -> tuple:
     """Prepare all instruments and bars for backtesting.
 
+    Tickers missing from the bar cache are wrangled in a process pool of
+    `workers` (default: CPU count; 1 disables the pool). Workers write the
+    cache rather than returning bars, since pickling Bar objects back costs
+    about as much as wrangling them.
+
     Returns:
         (instruments, bars, bar_types_map)
         - instruments: List of all Equity instruments
         - bars: List of all Bar objects
-        - bar_types_map: Dict mapping ticker -> bar_type string
+        - bar_types_map: Dict mapping ticker -> BarType
     """
     all_data = {**stock_data, **index_data}
+    paths = {t: _bar_cache_path(t, df, start_date, end_date) for t, df in all_data.items()}
+
+    # New entries are about to be written; drop those no run can hit anymore
+    missing = [t for t in all_data if not os.path.exists(paths[t])]
+    if missing:
+        _prune_bar_cache()
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as ex:
+            list(ex.map(_fill_bar_cache, missing, [all_data[t] for t in missing],
+                        repeat(start_date), repeat(end_date),
+                        [paths[t] for t in missing], chunksize=8))
 
     instruments = []
     all_bars = []
@@ -99,12 +216,12 @@ def prepare_all_data(
 
     for ticker, df in all_data.items():
         instrument = make_instrument(ticker)
-        bars = make_bars(ticker, instrument, df, start_date, end_date)
+        bars = load_bars(ticker, instrument, df, start_date, end_date, path=paths[ticker])
 
         if bars:
             instruments.append(instrument)
             all_bars.extend(bars)
-            bar_types_map[ticker] = f"{instrument.id}-1-DAY-LAST-EXTERNAL"
+            bar_types_map[ticker] = bars[0].bar_type
 
     return instruments, all_bars, bar_types_map
 
@@ -120,19 +237,21 @@ def get_equity(engine, venue, data_source, positions_report) -> float:
 
     position_value = 0.0
     if not positions_report.empty:
-        for _, pos in positions_report.iterrows():
-            ticker = str(pos['instrument_id']).split('.')[0]
-            qty = float(pos['quantity'])
-
+        tickers, qtys = _position_columns(positions_report)
+        for ticker, qty in zip(tickers, qtys):
             if ticker in data_source:
-                df = data_source[ticker]
-                close_col = 'Close' if 'Close' in df.columns else 'close'
-                last_price = float(df[close_col].iloc[-1])
-                position_value += qty * last_price
+                position_value += qty * float(data_source[ticker]['close'].iat[-1])
 
     return cash + position_value
 
 
+def _position_columns(positions_report: pd.DataFrame) -> tuple:
+    """Ticker and float quantity of each report row, as column arrays."""
+    tickers = positions_report['instrument_id'].astype(str).str.split('.').str[0].to_numpy()
+    qtys = positions_report['quantity'].astype(float).to_numpy()
+    return tickers, qtys
+
+
 def calculate_equity_curve(
     starting_cash: float,
     positions_report: pd.DataFrame,
@@ -147,10 +266,9 @@ def calculate_equity_curve(
     positions = {}
     total_cost = 0.0
 
-    for _, pos in positions_report.iterrows():
-        ticker = str(pos['instrument_id']).split('.')[0]
-        qty = float(pos['quantity'])
-        avg_px = float(pos['avg_px_open'])
+    tickers, qtys = _position_columns(positions_report)
+    avg_pxs = positions_report['avg_px_open'].astype(float).to_numpy()
+    for ticker, qty, avg_px in zip(tickers, qtys, avg_pxs):
         positions[ticker] = qty
         total_cost += qty * avg_px
 
@@ -160,22 +278,17 @@ def calculate_equity_curve(
     if first_ticker not in data_source:
         return pd.Series(dtype=float)
 
-    df = data_source[first_ticker].loc[start_date:end_date]
+    df = _date_slice(data_source[first_ticker], start_date, end_date)
     dates = df.index
 
-    equity = []
-    for date in dates:
-        position_value = 0.0
-        for ticker, qty in positions.items():
-            if ticker in data_source:
-                ticker_df = data_source[ticker]
-                close_col = 'Close' if 'Close' in ticker_df.columns else 'close'
-                if date in ticker_df.index:
-                    price = float(ticker_df.loc[date, close_col])
-                    position_value += qty * price
-        equity.append(cash + position_value)
+    # Closes of all held tickers as one (date x ticker) matrix; a ticker with
+    # no row on a date adds nothing that day
+    held = [t for t in positions if t in data_source]
+    closes = pd.concat([data_source[t]['close'].rename(t) for t in held], axis=1)
+    closes = closes.reindex(dates).fillna(0.0).to_numpy()
+    qty = np.array([positions[t] for t in held])
 
-    return pd.Series(equity, index=dates, name='equity')
+    return pd.Series(cash + closes @ qty, index=dates, name='equity')
 
 
 # =============================================================================
@@ -202,20 +315,45 @@ def save_results(result, equity_curve, config, output_dir):
     if len(equity_curve) > 1:
         returns = equity_curve.pct_change().dropna()
         if len(returns) > 1:
-            try:
-                qs.reports.html(
-                    returns,
-                    benchmark="SPY",
-                    output=os.path.join(output_dir, "report.html"),
-                    title=config.get('name', 'Strategy Report')
-                )
-                print(f"QuantStats report saved to {output_dir}/report.html")
-            except Exception as e:
-                print(f"Could not generate QuantStats report: {e}")
+            # Rendered in a background process so the next backtest can start;
+            # call wait_for_reports() before relying on report.html
+            global _REPORT_POOL
+            if _REPORT_POOL is None:
+                _REPORT_POOL = ProcessPoolExecutor(max_workers=1)
+            future = _REPORT_POOL.submit(
+                _write_report,
+                returns,
+                os.path.join(output_dir, "report.html"),
+                config.get('name', 'Strategy Report'),
+            )
+            future.add_done_callback(_report_done)
+            print(f"QuantStats report queued for {output_dir}/report.html")
 
     print(f"Results saved to {output_dir}/")
 
 
+def _write_report(returns: pd.Series, output: str, title: str) -> str:
+    """Worker: render one QuantStats HTML report."""
+    qs.reports.html(returns, benchmark="SPY", output=output, title=title)
+    return output
+
+
+def _report_done(future):
+    """Report the outcome of a background QuantStats render."""
+    try:
+        print(f"QuantStats report saved to {future.result()}")
+    except Exception as e:
+        print(f"Could not generate QuantStats report: {e}")
+
+
+def wait_for_reports():
+    """Block until all queued QuantStats reports are written."""
+    global _REPORT_POOL
+    if _REPORT_POOL is not None:
+        _REPORT_POOL.shutdown(wait=True)
+        _REPORT_POOL = None
+
+
 # =============================================================================
 # Main Backtest Runner
 # =============================================================================
@@ -279,13 +417,18 @@ def run_backtest(
         engine.add_instrument(instrument)
     engine.add_data(all_bars)
 
-    # 4. Create strategy - pass all data directly
+    # 4. Create strategy - pass all data directly, plus the stocks as aligned
+    # arrays for strategies that take them to index prices by (date, ticker)
+    panel = {}
+    if 'price_panel' in inspect.signature(strategy_class).parameters:
+        panel['price_panel'] = build_price_panel(stock_data)
     strategy = strategy_class(
         stock_data=stock_data,
         index_data=index_data,
         bar_types=bar_types_map,
         start_date=start_date,
         starting_cash=starting_cash,
+        **panel,
         **strategy_params
     )
     engine.add_strategy(strategy)
@@ -377,4 +520,6 @@ if __name__ == "__main__":
             save_to=os.path.join(RESULT_DIR, "MomentumStrategy"),
             invest_amount=50000,
             top_n=50,
-        )
\ No newline at end of file
+        )
+
+    wait_for_reports()
\ No newline at end of file
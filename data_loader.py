@@ -3,7 +3,10 @@
 import yaml
 import yfinance as yf
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 STOCK_DIR = os.path.join(DATA_DIR, "stock")
@@ -13,6 +16,10 @@ TICKER_FILE = os.path.join(os.path.dirname(__file__), "ticker.yaml")
 # Index tickers to download
 INDEX_TICKERS = ["^GSPC", "SPY"]  # S&P 500 index and ETF
 
+# download_data: one request for universes up to this size, else batches
+SINGLE_DOWNLOAD_LIMIT = 512
+FALLBACK_BATCH_SIZE = 256
+
 
 def load_tickers(path=TICKER_FILE):
     """Load stock tickers from YAML file."""
@@ -20,14 +27,17 @@ def load_tickers(path=TICKER_FILE):
         return yaml.safe_load(f)["tickers"]
 
 
-def download_data(tickers, start_date="2022-01-01", end_date="2025-01-01", batch_size=50):
+def download_data(tickers, start_date="2022-01-01", end_date="2025-01-01", batch_size=None):
     """Download historical daily data for a list of tickers from Yahoo Finance.
 
     Args:
         tickers: list of ticker symbols.
         start_date: start date string in "YYYY-MM-DD" format.
         end_date: end date string in "YYYY-MM-DD" format.
-        batch_size: number of tickers to download per batch.
+        batch_size: number of tickers to download per batch. By default up to
+            SINGLE_DOWNLOAD_LIMIT tickers go in one yf.download call (its own
+            thread pool fetches them concurrently); larger universes are split
+            into FALLBACK_BATCH_SIZE batches.
 
     Returns a dict of {ticker: DataFrame} with columns
     [Open, High, Low, Close, Volume].
@@ -35,6 +45,10 @@ def download_data(tickers, start_date="2022-01-01", end_date="2025-01-01", batch
     all_data = {}
     failed = []
 
+    if batch_size is None:
+        batch_size = len(tickers) if len(tickers) <= SINGLE_DOWNLOAD_LIMIT else FALLBACK_BATCH_SIZE
+    batch_size = max(batch_size, 1)
+
     for i in range(0, len(tickers), batch_size):
         batch = tickers[i : i + batch_size]
         print(f"Downloading batch {i // batch_size + 1} "
@@ -95,12 +109,13 @@ def download_index_data(tickers=INDEX_TICKERS, start_date="2022-01-01", end_date
 
 
 def save_stock_data(all_data, data_dir=STOCK_DIR):
-    """Save stock data to CSV files."""
+    """Save stock data to CSV files (drops the now stale combined file)."""
     os.makedirs(data_dir, exist_ok=True)
     for ticker, df in all_data.items():
         path = os.path.join(data_dir, f"{ticker}.csv")
         df.to_csv(path)
     print(f"Saved {len(all_data)} stock CSV files to {data_dir}/")
+    _remove_combined(data_dir)
 
 
 def save_index_data(all_data, data_dir=INDEX_DIR):
@@ -114,38 +129,194 @@ def save_index_data(all_data, data_dir=INDEX_DIR):
     print(f"Saved {len(all_data)} index CSV files to {data_dir}/")
 
 
-def load_stock_data(data_dir=STOCK_DIR):
-    """Load all stock CSVs into a dict of {ticker: DataFrame}."""
-    all_data = {}
+def save_stock_data_parquet(all_data, data_dir=STOCK_DIR):
+    """Save stock data to Parquet files (typed columns, no parsing on load).
+
+    Drops the now stale combined file, like save_stock_data.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    for ticker, df in all_data.items():
+        _write_parquet(df, os.path.join(data_dir, f"{ticker}.parquet"))
+    print(f"Saved {len(all_data)} stock Parquet files to {data_dir}/")
+    _remove_combined(data_dir)
+
+
+def save_index_data_parquet(all_data, data_dir=INDEX_DIR):
+    """Save index data to Parquet files (typed columns, no parsing on load)."""
+    os.makedirs(data_dir, exist_ok=True)
+    for ticker, df in all_data.items():
+        safe_name = ticker.replace("^", "")
+        _write_parquet(df, os.path.join(data_dir, f"{safe_name}.parquet"))
+    print(f"Saved {len(all_data)} index Parquet files to {data_dir}/")
+
+
+def save_stock_data_combined(all_data, data_dir=STOCK_DIR):
+    """Save all stocks to one long-format Parquet file next to data_dir.
+
+    Rows are (ticker, timestamp, OHLCV) grouped by ticker, so a load is a
+    single file read instead of one per ticker.
+    """
+    path = _combined_path(data_dir)
+    frames = [df.rename_axis("timestamp").reset_index().assign(ticker=ticker)
+              for ticker, df in all_data.items()]
+    table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+    pq.write_table(table, path, compression="zstd", row_group_size=100_000)
+    print(f"Saved {len(all_data)} stocks to {path}")
+
+
+def _combined_path(data_dir):
+    """Combined Parquet file for a data directory: data/stock -> data/stock.parquet."""
+    return os.path.normpath(data_dir) + ".parquet"
+
+
+def _remove_combined(data_dir):
+    """Delete data_dir's combined file, which load_stock_data would prefer."""
+    path = _combined_path(data_dir)
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"Removed stale {path}")
+
+
+def _read_combined(path, start_date=None, end_date=None):
+    """Read a combined Parquet file into a dict of {ticker: DataFrame}.
+
+    Optional start_date/end_date (end exclusive) are pushed down to the
+    Parquet reader so rows outside the window are never materialized.
+    """
+    filters = []
+    if start_date is not None:
+        filters.append(("timestamp", ">=", pd.Timestamp(start_date)))
+    if end_date is not None:
+        filters.append(("timestamp", "<", pd.Timestamp(end_date)))
+    df = pq.read_table(path, filters=filters or None).to_pandas()
+    df = df.set_index("timestamp")
+    return normalize_columns({ticker: group.drop(columns="ticker")
+                              for ticker, group in df.groupby("ticker", sort=False)})
+
+
+def _date_window(df, start_date=None, end_date=None):
+    """Rows of df (sorted DatetimeIndex) from start_date up to end_date, exclusive."""
+    lo = 0 if start_date is None else df.index.searchsorted(pd.Timestamp(start_date), side="left")
+    hi = len(df) if end_date is None else df.index.searchsorted(pd.Timestamp(end_date), side="left")
+    return df.iloc[lo:hi]
+
+
+def _write_parquet(df, path):
+    """Write one DataFrame (with its DatetimeIndex) as zstd Parquet."""
+    pq.write_table(pa.Table.from_pandas(df), path, compression="zstd")
+
+
+def _scan_data_dir(data_dir):
+    """(file name, mtime) of every ticker file in data_dir, sorted by name."""
+    with os.scandir(data_dir) as it:
+        return sorted((e.name, e.stat().st_mtime) for e in it
+                      if e.name.endswith((".csv", ".parquet")))
+
+
+def _read_data_dir(data_dir, entries=None):
+    """Read every ticker file in data_dir into a dict of {ticker: DataFrame}.
+
+    A ticker's .parquet file is used unless its .csv is newer (e.g. rewritten
+    by save_stock_data after the Parquet copy was made).
+    Columns are lowercased (see normalize_columns).
+
+    Args:
+        data_dir: per-ticker data directory
+        entries: _scan_data_dir(data_dir), if the caller already has it
+    """
+    if entries is None:
+        entries = _scan_data_dir(data_dir)
+    if not entries:
+        return {}
+
+    # Sorted by name, so a ticker's .csv comes before its .parquet
+    files, mtimes = {}, {}
+    for fname, mtime in entries:
+        ticker = os.path.splitext(fname)[0]
+        if ticker not in files or mtime >= mtimes[ticker]:
+            files[ticker], mtimes[ticker] = fname, mtime
+
+    # Parquet (Arrow) reads release the GIL, so files are read on a thread pool
+    paths = [os.path.join(data_dir, fname) for fname in files.values()]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        frames = ex.map(_read_file, paths)
+    return normalize_columns(dict(zip(files, frames)))
+
+
+def _read_file(path):
+    """Read one ticker file (Parquet, or CSV whose first column is the date)."""
+    if path.endswith(".parquet"):
+        return pq.read_table(path).to_pandas(split_blocks=True, self_destruct=True)
+
+    # pandas' own float parser: prices that print differently but are one
+    # float32 value (high 31.9614372253418, close 31.961437225341797) parse
+    # equal here, whereas a correctly rounded parser (pyarrow.csv) splits
+    # them by one ulp and make_bars then drops the bar as low > close
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def load_stock_data(data_dir=STOCK_DIR, start_date=None, end_date=None):
+    """Load all stocks into a dict of {ticker: DataFrame} with lowercase columns.
+
+    Reads the combined file from save_stock_data_combined when it exists and
+    no per-ticker file in data_dir is newer, otherwise the per-ticker Parquet
+    or CSV files. Either way, tickers with no rows in the date window are
+    left out.
+
+    Args:
+        data_dir: per-ticker data directory
+        start_date: optional first date to load
+        end_date: optional end date, exclusive
+    """
+    entries = _scan_data_dir(data_dir) if os.path.exists(data_dir) else []
+
+    # The combined file is a snapshot of data_dir; a newer per-ticker file
+    # (edited or re-downloaded since) means it is stale
+    combined = _combined_path(data_dir)
+    newest = max((mtime for _, mtime in entries), default=0.0)
+    if os.path.exists(combined) and os.path.getmtime(combined) >= newest:
+        all_data = _read_combined(combined, start_date, end_date)
+        print(f"Loaded {len(all_data)} stocks from {combined}")
+        return all_data
+
     if not os.path.exists(data_dir):
         print(f"Stock data directory not found: {data_dir}")
-        return all_data
+        return {}
 
-    for fname in sorted(os.listdir(data_dir)):
-        if fname.endswith(".csv"):
-            ticker = fname.replace(".csv", "")
-            df = pd.read_csv(os.path.join(data_dir, fname), index_col=0, parse_dates=True)
-            all_data[ticker] = df
+    all_data = _read_data_dir(data_dir, entries)
+    if start_date is not None or end_date is not None:
+        windowed = {t: _date_window(df, start_date, end_date) for t, df in all_data.items()}
+        all_data = {t: df for t, df in windowed.items() if not df.empty}
     print(f"Loaded {len(all_data)} stocks from {data_dir}/")
     return all_data
 
 
 def load_index_data(data_dir=INDEX_DIR):
-    """Load all index CSVs into a dict of {ticker: DataFrame}."""
-    all_data = {}
+    """Load all index files (Parquet or CSV) into a dict of {ticker: DataFrame}.
+
+    Columns are lowercase, as for load_stock_data.
+    """
     if not os.path.exists(data_dir):
         print(f"Index data directory not found: {data_dir}")
-        return all_data
+        return {}
 
-    for fname in sorted(os.listdir(data_dir)):
-        if fname.endswith(".csv"):
-            ticker = fname.replace(".csv", "")
-            df = pd.read_csv(os.path.join(data_dir, fname), index_col=0, parse_dates=True)
-            all_data[ticker] = df
+    all_data = _read_data_dir(data_dir)
     print(f"Loaded {len(all_data)} indices from {data_dir}/")
     return all_data
 
 
+def normalize_columns(all_data):
+    """Lowercase column names in place (Close -> close, ...).
+
+    Strategies, the stock selectors and the backtester read lowercase OHLCV
+    columns, so the loaders apply this once instead of every access checking
+    the case. Returns the same dict.
+    """
+    for df in all_data.values():
+        df.columns = df.columns.str.lower()
+    return all_data
+
+
 # Backward compatibility
 def save_data(all_data, data_dir=STOCK_DIR):
     """Backward compatible save function."""
@@ -166,6 +337,11 @@ if __name__ == "__main__":
     # stock_data = download_data(tickers, start_date="2022-01-01", end_date="2025-01-01")
     # save_stock_data(stock_data)
 
+    # Uncomment to convert the saved CSVs to Parquet for faster loading
+    # save_stock_data_combined(load_stock_data())
+    # save_stock_data_parquet(load_stock_data())
+    # save_index_data_parquet(load_index_data())
+
     # Download index data
     index_data = download_index_data(start_date="2022-01-01", end_date="2025-01-01")
     save_index_data(index_data)
\ No newline at end of file